@@ -1,40 +1,53 @@
+import argparse
 import json
 import os
+import sys
+
+# საერთო მოდულები (shared/) რეპოზიტორიის ძირშია
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.instrumentation import add_stats_arguments, configure, emit, metrics, timed
+from shared.persistence import JsonStore
 
 # ===============================
 # TranslationDictionary კლასი
 # ===============================
 class TranslationDictionary:
     """კლასი, რომელიც მართავს თარგმანების JSON ლექსიკონს"""
-    def __init__(self, file_path):
+    def __init__(self, file_path, compact=False):
         self.file_path = file_path
         self.translations = []  # list of dicts
+        self.store = JsonStore(file_path, lambda: {"translations": list(self.translations)},
+                               compact=compact, name="TranslationDictionary.save_file")
 
         # თუ ფაილი არსებობს, ჩაიტვირთოს
         if os.path.exists(file_path):
             self.load_file()
         else:
             # შექმნას ცარიელი JSON
-            self.save_file()
+            self.store.flush(force=True)
 
+    @timed("TranslationDictionary.load_file")
     def load_file(self):
         """JSON ფაილიდან თარგმანების ჩატვირთვა"""
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.translations = data.get("translations", [])
+            with open(self.file_path, "rb") as f:
+                raw = f.read()
+            metrics.add_bytes("TranslationDictionary.load_file", read=len(raw))
+            data = json.loads(raw.decode("utf-8"))
+            self.translations = data.get("translations", [])
         except Exception as e:
             print(f"Error reading JSON file: {e}")
             self.translations = []
 
     def save_file(self):
-        """თარგმანების შენახვა JSON ფაილში"""
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump({"translations": self.translations}, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error writing JSON file: {e}")
+        """თარგმანების შენახვა JSON ფაილში (ჯგუფური ჩაწერით, ფონურ ნაკადში)"""
+        self.store.mark_dirty()
 
+    def close(self):
+        """დაუმახსოვრებელი თარგმანების ჩაწერა. აბრუნებს False-ს, თუ ჩაწერა ვერ მოხერხდა"""
+        return self.store.close()
+
+    @timed("TranslationDictionary.translate")
     def translate(self, pair, word):
         """სიტყვის თარგმანის მოძებნა"""
         for t in self.translations:
@@ -131,7 +144,17 @@ class Translator:
 # პროგრამის დაწყება
 # ===============================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="თარჯიმანის აპლიკაცია")
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
     dict_file = "dictionary.json"
     translation_dict = TranslationDictionary(dict_file)
     translator = Translator(translation_dict)
-    translator.run()
+    try:
+        translator.run()
+    finally:
+        if not translation_dict.close():
+            print("გაფრთხილება: თარგმანები ფაილში ვერ შეინახა!")
+        emit(args)
@@ -1,5 +1,12 @@
+import argparse
 import json
 import os
+import sys
+
+# საერთო მოდულები (shared/) რეპოზიტორიის ძირშია
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.instrumentation import add_stats_arguments, configure, emit, timed
+from shared.persistence import JsonStore
 
 # ===============================
 # BankAccount კლასი
@@ -16,6 +23,7 @@ class BankAccount:
     def balance(self):
         return self._balance
 
+    @timed("BankAccount.deposit")
     def deposit(self, amount):
         """თანხის შეტანა ანგარიშზე"""
         if amount <= 0:
@@ -25,6 +33,7 @@ class BankAccount:
         print(f"{amount} შეიტანილია ანგარიშზე. მიმდინარე ბალანსი: {self._balance}")
         return True
 
+    @timed("BankAccount.withdraw")
     def withdraw(self, amount):
         """თანხის გატანა ანგარიშიდან"""
         if amount <= 0:
@@ -42,15 +51,16 @@ class BankAccount:
 # ===============================
 class Bank:
     """კლასი, რომელიც მართავს ყველა ანგარიშს და JSON ფაილს"""
-    def __init__(self, file_path):
+    def __init__(self, file_path, compact=False):
         self.file_path = file_path
         self.accounts = []
+        self.store = JsonStore(file_path, self._snapshot, compact=compact, name="Bank.save_accounts")
         self.load_accounts()
 
     def load_accounts(self):
         """JSON ფაილიდან ანგარიშების ჩატვირთვა"""
         if not os.path.exists(self.file_path):
-            self.save_accounts()
+            self.store.flush(force=True)
         try:
             with open(self.file_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
@@ -63,22 +73,31 @@ class Bank:
             print(f"ფაილის წაკითხვის შეცდომა: {e}")
             self.accounts = []
 
+    def _snapshot(self):
+        """ანგარიშების ლექსიკონი JSON-ში შესანახად"""
+        return {"accounts": [
+            {
+                "account_number": acc.account_number,
+                "fullname": acc.fullname,
+                "password": acc.password,
+                "balance": acc.balance
+            }
+            for acc in list(self.accounts)
+        ]}
+
     def save_accounts(self):
-        """ანგარიშების შენახვა JSON ფაილში"""
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump({"accounts": [
-                    {
-                        "account_number": acc.account_number,
-                        "fullname": acc.fullname,
-                        "password": acc.password,
-                        "balance": acc.balance
-                    }
-                    for acc in self.accounts
-                ]}, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"ფაილის შენახვის შეცდომა: {e}")
+        """ანგარიშების შენახვა JSON ფაილში (ჯგუფური ჩაწერით, ფონურ ნაკადში)"""
+        self.store.mark_dirty()
 
+    def close(self):
+        """დაუმახსოვრებელი ცვლილებების ჩაწერა. აბრუნებს False-ს, თუ ჩაწერა ვერ მოხერხდა"""
+        return self.store.close()
+
+    def batch(self):
+        """რამდენიმე ნაბიჯიანი ოპერაცია (მაგ. გადარიცხვა): ფაილში მხოლოდ დასრულებული მდგომარეობა ჩაიწერება"""
+        return self.store.batch()
+
+    @timed("Bank.find_account")
     def find_account(self, account_number):
         """ანგარიშის მოძებნა ნომრით"""
         for acc in self.accounts:
@@ -160,10 +179,13 @@ class ATM:
         except ValueError:
             print("გთხოვთ შეიყვანოთ რიცხვი!")
             return
-        if self.current_account.withdraw(amount + withdrawal_fee):
+        # ჩამოჭრა და ჩარიცხვა ფაილში ერთად უნდა მოხვდეს
+        with self.bank.batch():
+            if not self.current_account.withdraw(amount + withdrawal_fee):
+                return
             target_acc.deposit(amount)
             self.bank.save_accounts()
-            print(f"{amount} წარმატებით გადარიცხულია ანგარიშზე {target_acc_num} (საკომისიო: {withdrawal_fee})")
+        print(f"{amount} წარმატებით გადარიცხულია ანგარიშზე {target_acc_num} (საკომისიო: {withdrawal_fee})")
 
     def run(self):
         """აპლიკაციის მთავარი ციკლი"""
@@ -229,7 +251,17 @@ class ATM:
 # პროგრამის დაწყება
 # ===============================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ბანკომატი")
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
     bank_file = "accounts.json"
     bank = Bank(bank_file)
     atm = ATM(bank)
-    atm.run()
+    try:
+        atm.run()
+    finally:
+        if not bank.close():
+            print("გაფრთხილება: ანგარიშები ფაილში ვერ შეინახა!")
+        emit(args)
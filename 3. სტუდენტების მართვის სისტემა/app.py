@@ -1,9 +1,28 @@
+import argparse
+import contextlib
 import json
 import os
+import shlex
+import sys
+from collections import Counter
 from typing import List, Optional
 
+# საერთო მოდულები (shared/) რეპოზიტორიის ძირშია
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.instrumentation import add_stats_arguments, configure, emit, timed
+from shared.persistence import JsonStore
+
 STUDENTS_FILE = "students.json"
 
+# შეფასების ქულები (grade points) - ცნობილი შეფასებები; უცნობი შეფასება საშუალოში არ ითვლება
+GRADE_POINTS = {
+    "A+": 4.0, "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D+": 1.3, "D": 1.0, "D-": 0.7,
+    "F": 0.0,
+}
+
 
 class Student:
     """სტუდენტის კლასი"""
@@ -104,23 +123,143 @@ class HonorsStudent(Student):
         return f"[წარჩინებული] სახელი: {self.name}, სიის ნომერი: {self.roll_number}, შეფასება: {self.grade}, დახასიათება: {self.honors_note}"
 
 
+# GradeStatistics კლასი: სტატისტიკა, რომელიც ახლდება ყოველ ცვლილებაზე
+class GradeStatistics:
+    """ინახავს მთვლელებს შეფასების, ტიპის და ქულის მიხედვით. შეკითხვები სრულდება O(1) დროში."""
+    def __init__(self):
+        self.by_grade: Counter = Counter()
+        self.by_type: Counter = Counter()
+        self.by_points: Counter = Counter()
+        self._total = 0
+        self._graded = 0
+        # ქულების ჯამი მეათედებში (int), რომ დამატება/წაშლისას float-ის ცდომილება არ დაგროვდეს
+        self._points_tenths = 0
+
+    @staticmethod
+    def grade_key(grade: str) -> str:
+        """შეფასების ნორმალიზება (მაგ., 'c' და 'C' ერთი და იგივე შეფასებაა)."""
+        return grade.strip().upper()
+
+    @staticmethod
+    def grade_points(grade: str) -> Optional[float]:
+        """აბრუნებს შეფასების ქულას ან None-ს, თუ შეფასება უცნობია."""
+        return GRADE_POINTS.get(GradeStatistics.grade_key(grade))
+
+    def _apply(self, student_type: str, grade: str, delta: int):
+        """მთვლელების განახლება delta-ით (+1 დამატება, -1 წაშლა)."""
+        grade = self.grade_key(grade)
+        self._total += delta
+        self.by_type[student_type] += delta
+        self.by_grade[grade] += delta
+        if self.by_type[student_type] <= 0:
+            del self.by_type[student_type]
+        if self.by_grade[grade] <= 0:
+            del self.by_grade[grade]
+
+        points = self.grade_points(grade)
+        if points is not None:
+            self._graded += delta
+            self._points_tenths += delta * round(points * 10)
+            self.by_points[points] += delta
+            if self.by_points[points] <= 0:
+                del self.by_points[points]
+
+    def add(self, student: Student):
+        """სტუდენტის დამატება სტატისტიკაში."""
+        self._apply(type(student).__name__, student.grade, 1)
+
+    def remove(self, student: Student, grade: Optional[str] = None):
+        """სტუდენტის ამოღება სტატისტიკიდან. grade - ძველი შეფასება, თუ ის უკვე შეიცვალა."""
+        self._apply(type(student).__name__, student.grade if grade is None else grade, -1)
+
+    def clear(self):
+        """ყველა მთვლელის განულება."""
+        self.by_grade.clear()
+        self.by_type.clear()
+        self.by_points.clear()
+        self._total = 0
+        self._graded = 0
+        self._points_tenths = 0
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def count_by_grade(self, grade: str) -> int:
+        return self.by_grade.get(self.grade_key(grade), 0)
+
+    def count_by_type(self, student_type: str) -> int:
+        return self.by_type.get(student_type, 0)
+
+    def honors_count(self) -> int:
+        return self.count_by_type("HonorsStudent")
+
+    def average_grade_points(self) -> Optional[float]:
+        """საშუალო ქულა ცნობილი შეფასებების მიხედვით. თუ ასეთი არ არის, ბრუნდება None."""
+        if not self._graded:
+            return None
+        return self._points_tenths / 10 / self._graded
+
+    def summary(self) -> dict:
+        """სტატისტიკის ლექსიკონი (რეპორტისთვის და შედარებისთვის)."""
+        average = self.average_grade_points()
+        return {
+            "total": self._total,
+            "by_type": dict(self.by_type),
+            "by_grade": dict(self.by_grade),
+            "by_points": dict(self.by_points),
+            "average_grade_points": None if average is None else round(average, 2),
+        }
+
+    @classmethod
+    def from_students(cls, students: List[Student]) -> "GradeStatistics":
+        """სრული გადათვლა მთელი სიიდან (ვერიფიკაციისთვის) - მთვლელები ივსება ერთიანად, Counter-ით."""
+        stats = cls()
+        grades = [cls.grade_key(s.grade) for s in students]
+        points = [p for p in map(cls.grade_points, grades) if p is not None]
+        stats.by_grade = Counter(grades)
+        stats.by_type = Counter(type(s).__name__ for s in students)
+        stats.by_points = Counter(points)
+        stats._total = len(grades)
+        stats._graded = len(points)
+        stats._points_tenths = sum(round(p * 10) for p in points)
+        return stats
+
+    def report(self) -> str:
+        """რეპორტის ტექსტი კონსოლისთვის."""
+        average = self.average_grade_points()
+        lines = [
+            f"სულ სტუდენტები: {self._total}",
+            f"ჩვეულებრივი: {self.count_by_type('Student')}, წარჩინებული: {self.honors_count()}",
+            "შეფასებების განაწილება:",
+        ]
+        for grade in sorted(self.by_grade):
+            lines.append(f"  {grade}: {self.by_grade[grade]}")
+        if average is None:
+            lines.append("საშუალო ქულა: -")
+        else:
+            lines.append(f"საშუალო ქულა: {average:.2f}")
+        return "\n".join(lines)
+
+
 # StudentManager კლასი
 class StudentManager:
     """კლასი პასუხისმგებელია სტუდენტთა სიაზე და JSON ფაილზე (create/read/update/delete)."""
-    def __init__(self, file_path: str = STUDENTS_FILE):
+    def __init__(self, file_path: str = STUDENTS_FILE, compact: bool = False):
         self.file_path = file_path
         self.students: List[Student] = []
+        self.stats = GradeStatistics()
+        # ცვლილებები ფაილში იწერება ჯგუფურად, ფონურ ნაკადში (store.autocommit=False - მხოლოდ save_to_file()-ზე)
+        self.store = JsonStore(file_path, lambda: {"students": [s.to_dict() for s in list(self.students)]},
+                               compact=compact, name="StudentManager.save_to_file")
         self.load_from_file()
 
     def load_from_file(self):
         """ჩატვირთე students.json ფაილიდან. თუ ფაილი არ არსებობს, შეიქმნება ცარიელი ფაილი."""
         if not os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, "w", encoding="utf-8") as f:
-                    json.dump({"students": []}, f, ensure_ascii=False, indent=2)
-            except Exception as e:
-                print(f"ფაილის შექმნის შეცდომა: {e}")
             self.students = []
+            self.stats.clear()
+            self.store.flush(force=True)
             return
 
         try:
@@ -138,14 +277,19 @@ class StudentManager:
         except Exception as e:
             print(f"ფაილიდან წაკითხვის შეცდომა: {e}")
             self.students = []
+        self.stats = GradeStatistics.from_students(self.students)
 
-    def save_to_file(self):
-        """შენახვა JSON ფაილში."""
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump({"students": [s.to_dict() for s in self.students]}, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"ფაილში შენახვის შეცდომა: {e}")
+    def save_to_file(self) -> bool:
+        """დაგროვილი ცვლილებების დაუყოვნებლივ შენახვა JSON ფაილში."""
+        return self.store.flush()
+
+    def _changed(self):
+        """ცვლილების დაფიქსირება: ფაილი ჩაიწერება ჯგუფურად (ან save_to_file()-ზე, თუ autocommit გამორთულია)."""
+        self.store.mark_dirty()
+
+    def close(self) -> bool:
+        """დაუმახსოვრებელი ცვლილებების ჩაწერა და ფონური ნაკადის გაჩერება."""
+        return self.store.close()
 
     def get_max_roll_number(self) -> int:
         """მაქსიმალური სიის ნომრის დადგენა სტუდენტების სიიდან. თუ სტუდენტების სია ცარიელია, ბრუნდება 0."""
@@ -162,13 +306,15 @@ class StudentManager:
             print(f"Error: {student.roll_number} სიის ნომრით სტუდენტი უკვე არსებობს")
             return False
         self.students.append(student)
-        self.save_to_file()
+        self.stats.add(student)
+        self._changed()
         return True
 
     def list_students(self) -> List[Student]:
         """აბრუნებს სტუდენტების სიას."""
         return list(self.students)
 
+    @timed("StudentManager.find_by_roll_number")
     def find_by_roll_number(self, roll_number: int) -> Optional[Student]:
         """ეძებს სტუდენტს სიის ნომრის მიხედვით."""
         for s in self.students:
@@ -182,22 +328,27 @@ class StudentManager:
         if not stud:
             print("სტუდენტი ვერ მოიძებნა.")
             return False
-        try:
-            stud.grade = new_grade
-
-            # მოწმდება შეფასება, და თუ ის არ უდრის A, A+ ან A-, სტატუსი იცვლება ჩვეულებრივ სტუდენტად
-            if new_grade not in ["A", "A+", "A-"]:
-                if isinstance(stud, HonorsStudent):
-                    print(f"შეფასება '{new_grade}' არ არის წარჩინებული. სტუდენტი იცვლება ჩვეულებრივ სტუდენტად.")
-                    self.students.remove(stud)
-                    stud = Student(stud.name, stud.roll_number, stud.grade)
-                    self.students.append(stud)
-
-            self.save_to_file()
-            return True
-        except ValueError as e:
-            print(f"ვალიდაციის შეცდომა: {e}")
-            return False
+        # შეფასების შეცვლა და ტიპის ცვლა ფაილში ერთად უნდა მოხვდეს
+        with self.store.batch():
+            try:
+                old_grade = stud.grade
+                stud.grade = new_grade
+                self.stats.remove(stud, grade=old_grade)
+
+                # მოწმდება შეფასება, და თუ ის არ უდრის A, A+ ან A-, სტატუსი იცვლება ჩვეულებრივ სტუდენტად
+                if new_grade not in ["A", "A+", "A-"]:
+                    if isinstance(stud, HonorsStudent):
+                        print(f"შეფასება '{new_grade}' არ არის წარჩინებული. სტუდენტი იცვლება ჩვეულებრივ სტუდენტად.")
+                        self.students.remove(stud)
+                        stud = Student(stud.name, stud.roll_number, stud.grade)
+                        self.students.append(stud)
+
+                self.stats.add(stud)
+                self._changed()
+                return True
+            except ValueError as e:
+                print(f"ვალიდაციის შეცდომა: {e}")
+                return False
 
     def delete_student(self, roll_number: int) -> bool:
         """სტუდენტის წაშლა სიის ნომრის მიხედვით."""
@@ -206,15 +357,27 @@ class StudentManager:
             print("სტუდენტი ვერ მოიძებნა.")
             return False
         self.students.remove(stud)
-        self.save_to_file()
+        self.stats.remove(stud)
+        self._changed()
         return True
 
+    def grade_report(self) -> str:
+        """სტატისტიკის რეპორტი (მთვლელებიდან, სიის გადავლის გარეშე)."""
+        return self.stats.report()
+
+    def verify_stats(self) -> bool:
+        """ამოწმებს, რომ ინკრემენტული სტატისტიკა ემთხვევა სრულ გადათვლას."""
+        return self.stats.summary() == GradeStatistics.from_students(self.students).summary()
+
     def delete_data_file(self) -> bool:
         """JSON ფაილის წაშლა."""
         try:
             if os.path.exists(self.file_path):
+                # დაგეგმილმა ჩაწერამ ფაილი თავიდან არ უნდა შექმნას
+                self.store.discard()
                 os.remove(self.file_path)
                 self.students = []
+                self.stats.clear()
                 print("students.json წაიშალა.")
                 return True
             else:
@@ -272,9 +435,190 @@ def input_roll_number_unique(manager: StudentManager) -> int:
         return r
 
 
+# სკრიპტის რეჟიმი: ბრძანებების შესრულება input()-ის გარეშე
+class ScriptError(Exception):
+    """სკრიპტის ბრძანების შეცდომა (არასწორი არგუმენტები ან შეუსრულებელი ოპერაცია)."""
+
+
+def _parse_roll_number(value: str) -> int:
+    """სიის ნომრის ვალიდაცია სკრიპტის არგუმენტიდან."""
+    try:
+        v = int(value)
+    except ValueError:
+        raise ScriptError(f"სიის ნომერი უნდა იყოს მთელი რიცხვი: {value}")
+    if v <= 0:
+        raise ScriptError("სიის ნომერი უნდა იყოს დადებითი მთელი რიცხვი.")
+    return v
+
+
+def _script_add(manager: StudentManager, args: List[str]) -> dict:
+    """add <სახელი> <შეფასება> [--honors] [--note <ტექსტი>] [--roll <ნომერი>]"""
+    positional = []
+    honors = False
+    note = ""
+    roll_number = 0
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--honors":
+            honors = True
+        elif arg in ("--note", "--roll"):
+            if i + 1 >= len(args):
+                raise ScriptError(f"{arg} მოითხოვს მნიშვნელობას.")
+            i += 1
+            if arg == "--note":
+                note = args[i]
+                honors = True
+            else:
+                roll_number = _parse_roll_number(args[i])
+        else:
+            positional.append(arg)
+        i += 1
+    if len(positional) != 2:
+        raise ScriptError("გამოყენება: add <სახელი> <შეფასება> [--honors] [--note <ტექსტი>] [--roll <ნომერი>]")
+
+    name, grade = positional
+    try:
+        if honors:
+            stud = HonorsStudent(name, roll_number, grade, note)
+        else:
+            stud = Student(name, roll_number, grade)
+    except ValueError as e:
+        raise ScriptError(str(e))
+    if not manager.add_student(stud):
+        raise ScriptError(f"{stud.roll_number} სიის ნომრით სტუდენტი უკვე არსებობს")
+    return {"student": stud.to_dict()}
+
+
+def _script_update_grade(manager: StudentManager, args: List[str]) -> dict:
+    """update-grade <ნომერი> <შეფასება>"""
+    if len(args) != 2:
+        raise ScriptError("გამოყენება: update-grade <ნომერი> <შეფასება>")
+    roll_number = _parse_roll_number(args[0])
+    if manager.find_by_roll_number(roll_number) is None:
+        raise ScriptError("სტუდენტი ვერ მოიძებნა.")
+    if not manager.update_grade(roll_number, args[1]):
+        raise ScriptError(f"არასწორი შეფასება: {args[1]}")
+    return {"student": manager.find_by_roll_number(roll_number).to_dict()}
+
+
+def _script_delete(manager: StudentManager, args: List[str]) -> dict:
+    """delete <ნომერი>"""
+    if len(args) != 1:
+        raise ScriptError("გამოყენება: delete <ნომერი>")
+    roll_number = _parse_roll_number(args[0])
+    if not manager.delete_student(roll_number):
+        raise ScriptError("სტუდენტი ვერ მოიძებნა.")
+    return {"roll_number": roll_number}
+
+
+def _script_find(manager: StudentManager, args: List[str]) -> dict:
+    """find <ნომერი>"""
+    if len(args) != 1:
+        raise ScriptError("გამოყენება: find <ნომერი>")
+    stud = manager.find_by_roll_number(_parse_roll_number(args[0]))
+    if stud is None:
+        raise ScriptError("სტუდენტი ვერ მოიძებნა.")
+    return {"student": stud.to_dict()}
+
+
+def _script_list(manager: StudentManager, args: List[str]) -> dict:
+    """list"""
+    if args:
+        raise ScriptError("გამოყენება: list")
+    return {"students": [s.to_dict() for s in manager.list_students()]}
+
+
+def _script_stats(manager: StudentManager, args: List[str]) -> dict:
+    """stats [--verify] - --verify ადარებს მთვლელებს სრულ გადათვლას."""
+    if args not in ([], ["--verify"]):
+        raise ScriptError("გამოყენება: stats [--verify]")
+    result = {"stats": manager.stats.summary()}
+    if args:
+        result["verified"] = manager.verify_stats()
+    return result
+
+
+def _script_checkpoint(manager: StudentManager, args: List[str]) -> dict:
+    """checkpoint - დაგროვილი ცვლილებების შენახვა ფაილში."""
+    if args:
+        raise ScriptError("გამოყენება: checkpoint")
+    if not manager.save_to_file():
+        raise ScriptError("ფაილში შენახვა ვერ მოხერხდა.")
+    return {}
+
+
+SCRIPT_HANDLERS = {
+    "add": _script_add,
+    "update-grade": _script_update_grade,
+    "delete": _script_delete,
+    "find": _script_find,
+    "list": _script_list,
+    "stats": _script_stats,
+    "checkpoint": _script_checkpoint,
+}
+SCRIPT_COMMANDS = ", ".join(SCRIPT_HANDLERS)
+
+
+def run_script(manager: StudentManager, lines, out=None) -> int:
+    """
+    ასრულებს ბრძანებებს (თითო ხაზზე ერთი) ერთ ჩატვირთულ manager-ზე.
+    თითოეულ ბრძანებაზე out-ში იწერება ერთი JSON ხაზი. ფაილი ინახება მხოლოდ
+    'checkpoint' ბრძანებისას და სკრიპტის ბოლოს. აბრუნებს წარუმატებელი ბრძანებების რაოდენობას.
+    """
+    out = out or sys.stdout
+    failures = 0
+    manager.store.autocommit = False
+    try:
+        for line_no, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            result = {"line": line_no}
+            try:
+                tokens = shlex.split(line)
+                command, args = tokens[0], tokens[1:]
+                result["command"] = command
+                handler = SCRIPT_HANDLERS.get(command)
+                if handler is None:
+                    raise ScriptError(f"უცნობი ბრძანება: {command} (ხელმისაწვდომია: {SCRIPT_COMMANDS})")
+                # manager-ის შეტყობინებები stderr-ში გადადის, რომ stdout დარჩეს მხოლოდ JSON
+                with contextlib.redirect_stdout(sys.stderr):
+                    result.update(handler(manager, args))
+                result["ok"] = True
+            except (ScriptError, ValueError) as e:
+                failures += 1
+                result["ok"] = False
+                result["error"] = str(e)
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        saved = True
+        if manager.store.dirty:
+            with contextlib.redirect_stdout(sys.stderr):
+                saved = manager.save_to_file()
+        manager.store.autocommit = True
+    if not saved:
+        # სკრიპტის ბოლოს შენახვა ვერ მოხერხდა - ცვლილებები ფაილში არ არის
+        failures += 1
+        result = {"command": "save", "ok": False, "error": "ფაილში შენახვა ვერ მოხერხდა."}
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return failures
+
+
 # მენიუ
-def main_menu():
-    manager = StudentManager()
+def main_menu(file_path: str = STUDENTS_FILE):
+    manager = StudentManager(file_path)
+    try:
+        run_menu(manager)
+    finally:
+        # ცვლილებების ჩაწერა გასვლისას (მათ შორის Ctrl+C-ზე)
+        if not manager.close():
+            print("გაფრთხილება: ცვლილებები ფაილში ვერ შეინახა!")
+
+
+def run_menu(manager: StudentManager):
+    """ინტერაქტიური მენიუს ციკლი."""
     print("== სტუდენტების მართვის სისტემა ==")
 
     while True:
@@ -286,9 +630,10 @@ def main_menu():
         print("4. სტუდენტის შეფასების განახლება")
         print("5. სტუდენტის წაშლა")
         print("6. students.json ფაილის წაშლა")
-        print("7. გამოსვლა")
+        print("7. სტატისტიკა და რეპორტი")
+        print("8. გამოსვლა")
 
-        choice = input("აირჩიეთ ოპერაცია (1-7): ").strip()
+        choice = input("აირჩიეთ ოპერაცია (1-8): ").strip()
         if choice == "1":
             # ახალი სტუდენტის დამატება
             try:
@@ -354,11 +699,56 @@ def main_menu():
                 print("ოპერაცია გაუქმებულია.")
 
         elif choice == "7":
+            # სტატისტიკა და რეპორტი
+            print("\n--- სტატისტიკა ---")
+            print(manager.grade_report())
+
+        elif choice == "8":
             print("გამოსვლა...")
             break
         else:
-            print("არასწორი არჩევანი. შეიყვანეთ 1-7 შორის.")
+            print("არასწორი არჩევანი. შეიყვანეთ 1-8 შორის.")
+
+
+def run_script_file(file_path: str, script: str):
+    """--script რეჟიმი: ბრძანებების შესრულება ფაილიდან ან stdin-დან და გასვლა შესაბამისი კოდით."""
+    with contextlib.redirect_stdout(sys.stderr):
+        manager = StudentManager(file_path)
+    failures = 0
+    try:
+        if script == "-":
+            failures = run_script(manager, sys.stdin)
+        else:
+            try:
+                with open(script, "r", encoding="utf-8") as f:
+                    failures = run_script(manager, f)
+            except OSError as e:
+                print(f"სკრიპტის წაკითხვის შეცდომა: {e}", file=sys.stderr)
+                sys.exit(2)
+    finally:
+        with contextlib.redirect_stdout(sys.stderr):
+            saved = manager.close()
+    sys.exit(1 if failures or not saved else 0)
+
+
+def main():
+    """გაშვება: ინტერაქტიური მენიუ ან --script რეჟიმი."""
+    parser = argparse.ArgumentParser(description="სტუდენტების მართვის სისტემა")
+    parser.add_argument("--file", default=STUDENTS_FILE, help="სტუდენტების JSON ფაილი")
+    parser.add_argument("--script", metavar="PATH",
+                        help=f"ბრძანებების ფაილი ('-' - stdin). ბრძანებები: {SCRIPT_COMMANDS}")
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
+    try:
+        if args.script is None:
+            main_menu(args.file)
+        else:
+            run_script_file(args.file, args.script)
+    finally:
+        emit(args)
 
 
 if __name__ == "__main__":
-    main_menu()
+    main()
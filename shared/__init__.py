@@ -0,0 +1 @@
+"""სამივე აპლიკაციის საერთო მოდულები."""
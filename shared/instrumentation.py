@@ -0,0 +1,143 @@
+import functools
+import json
+import math
+import sys
+import threading
+import time
+
+
+# ===============================
+# OperationStats კლასი
+# ===============================
+class OperationStats:
+    """ერთი ოპერაციის სტატისტიკა: გამოძახებები, დრო, ჰისტოგრამა და ბაიტები"""
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        # ჰისტოგრამა: i-ური კალათა - დრო <= 2**i მიკროწამი
+        self.buckets = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def add_timing(self, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        bucket = max(0, math.ceil(seconds * 1_000_000) - 1).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "avg_us": round(self.total_seconds / self.count * 1_000_000, 1) if self.count else 0.0,
+            "max_us": round(self.max_seconds * 1_000_000, 1),
+            "histogram_us": {f"<={2 ** b}": self.buckets[b] for b in sorted(self.buckets)},
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+# ===============================
+# Instrumentation კლასი
+# ===============================
+class Instrumentation:
+    """
+    ოპერაციების გაზომვა. ნაგულისხმევად გამორთულია - ამ დროს timed() მხოლოდ
+    ერთ შემოწმებას ამატებს და add_bytes() არაფერს აკეთებს.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def _get(self, name):
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = OperationStats()
+        return stats
+
+    def record(self, name, seconds):
+        """ოპერაციის ხანგრძლივობის ჩაწერა"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._get(name).add_timing(seconds)
+
+    def add_bytes(self, name, read=0, written=0):
+        """წაკითხული/ჩაწერილი ბაიტების დამატება"""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._get(name)
+            stats.bytes_read += read
+            stats.bytes_written += written
+
+    def timed(self, name):
+        """დეკორატორი: ზომავს ფუნქციის შესრულების დროს name სახელით"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """სტატისტიკის ლექსიკონი (JSON-ისთვის)"""
+        with self._lock:
+            return {name: self.operations[name].to_dict() for name in sorted(self.operations)}
+
+    def report(self):
+        """სტატისტიკის ცხრილი კონსოლისთვის"""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return "სტატისტიკა ცარიელია."
+        lines = [f"{'ოპერაცია':<40} {'რაოდ.':>7} {'საშ. µs':>10} {'მაქს. µs':>10} {'წაკითხ. B':>10} {'ჩაწერ. B':>10}"]
+        for name, s in snapshot.items():
+            lines.append(f"{name:<40} {s['count']:>7} {s['avg_us']:>10} {s['max_us']:>10} {s['bytes_read']:>10} {s['bytes_written']:>10}")
+            if s["histogram_us"]:
+                lines.append("    " + ", ".join(f"{k}µs: {v}" for k, v in s["histogram_us"].items()))
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        """სტატისტიკის შენახვა JSON ფაილში"""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"სტატისტიკის შენახვის შეცდომა: {e}", file=sys.stderr)
+
+
+# საერთო ობიექტი სამივე აპლიკაციისთვის
+metrics = Instrumentation()
+timed = metrics.timed
+
+
+def add_stats_arguments(parser):
+    """--stats და --stats-json არგუმენტების დამატება argparse-ისთვის"""
+    parser.add_argument("--stats", action="store_true", help="ოპერაციების სტატისტიკის ჩვენება გასვლისას (stderr)")
+    parser.add_argument("--stats-json", metavar="PATH", help="ოპერაციების სტატისტიკის შენახვა JSON ფაილში გასვლისას")
+
+
+def configure(args):
+    """სტატისტიკის ჩართვა, თუ მოთხოვნილია --stats ან --stats-json"""
+    if args.stats or args.stats_json:
+        metrics.enable()
+
+
+def emit(args):
+    """სტატისტიკის გამოტანა/შენახვა პროგრამის ბოლოს"""
+    if args.stats:
+        print(metrics.report(), file=sys.stderr)
+    if args.stats_json:
+        metrics.dump_json(args.stats_json)
@@ -0,0 +1,215 @@
+import atexit
+import contextlib
+import json
+import os
+import stat
+import threading
+import time
+import weakref
+
+from shared.instrumentation import metrics
+
+# ღია (დაუხურავი) store-ები; პროგრამიდან გასვლისას ყველა იხურება და ჩაიწერება
+_open_stores = weakref.WeakSet()
+
+# რამდენ წამში ერთხელ უშვებს ფონური ნაკადი store-ის მიმართვას, როცა ცვლილებები არ არის
+_IDLE_TIMEOUT = 1.0
+
+
+# ===============================
+# JsonStore კლასი
+# ===============================
+class JsonStore:
+    """
+    JSON ფაილის საერთო შენახვის ფენა.
+
+    - mark_dirty() აფიქსირებს ცვლილებას; ჩაწერა ხდება ფონურ ნაკადში მას შემდეგ, რაც
+      პირველი ცვლილებიდან გავა `delay` წამი ან დაგროვდება `max_pending` ცვლილება
+      (group commit - რამდენიმე ცვლილება ერთ ჩაწერაში).
+    - ჩაწერა ატომურია: დროებითი ფაილი იმავე საქაღალდეში + os.replace.
+    - compact=True ინახავს JSON-ს indent-ის გარეშე.
+    - პროგრამიდან გასვლისას (atexit) დაუმახსოვრებელი ცვლილებები აუცილებლად ჩაიწერება.
+    - თუ ფონური ჩაწერა ვერ მოხერხდა, შეცდომა ერთხელ გამოჩნდება და ახალი ცდა მოხდება
+      მხოლოდ შემდეგ ცვლილებაზე ან flush()/close()-ზე; მონაცემები რჩება dirty.
+      flush()/close()-ის შეცდომა ყოველთვის გამოჩნდება.
+    - batch() ბლოკის განმავლობაში snapshot არ აიღება, რომ ფაილში არ მოხვდეს
+      ნახევრად შესრულებული ოპერაცია (მაგ. გადარიცხვა).
+
+    snapshot - ფუნქცია, რომელიც აბრუნებს შესანახ მონაცემებს (dict). ის ფონურ ნაკადშიც
+    გამოიძახება, ამიტომ სიები უმჯობესია დააკოპიროს (მაგ. list(self.items)).
+    name - სტატისტიკაში ამ სახელით აღირიცხება ყოველი ფაქტობრივი ჩაწერა (დრო და ბაიტები).
+    """
+    def __init__(self, file_path, snapshot, delay=0.5, max_pending=50, compact=False, background=True, name=None):
+        self.file_path = file_path
+        self.name = name or os.path.basename(file_path)
+        self._snapshot = snapshot
+        self.delay = delay
+        self.max_pending = max_pending
+        self.compact = compact
+        # autocommit=False: ცვლილებები მხოლოდ აღირიცხება, ჩაწერა ხდება flush()/close()-ზე
+        self.autocommit = True
+
+        self._cond = threading.Condition()
+        # რიგი: ჯერ _batch_lock, შემდეგ _write_lock
+        self._batch_lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._pending = 0
+        self._first_change = None
+        self._closed = False
+        # ბოლო ჩაწერა ვერ მოხერხდა: ფონური ნაკადი აღარ ცდის, სანამ ახალი ცვლილება არ მოვა
+        self._failed = False
+        self._error_reported = False
+
+        # ფონური ნაკადი იქმნება პირველ ცვლილებაზე
+        self._background = background
+        self._thread = None
+        _open_stores.add(self)
+
+    @property
+    def dirty(self):
+        """არის თუ არა დაუმახსოვრებელი ცვლილებები"""
+        return self._pending > 0
+
+    def mark_dirty(self):
+        """ცვლილების დაფიქსირება და ჩაწერის დაგეგმვა"""
+        with self._cond:
+            self._pending += 1
+            if self._first_change is None or self._failed:
+                self._first_change = time.monotonic()
+            self._failed = False
+            background = self._background and not self._closed
+            if background and self._thread is None:
+                self._thread = threading.Thread(target=_writer_loop, args=(weakref.ref(self),),
+                                                name=f"JsonStore({self.file_path})", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        if self.autocommit and not background:
+            self.flush()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """რამდენიმე ნაბიჯიანი ცვლილება: ბლოკის განმავლობაში ფაილში ჩაწერა (snapshot) არ მოხდება"""
+        with self._batch_lock:
+            yield self
+
+    def discard(self):
+        """დაუმახსოვრებელი ცვლილებების გაუქმება (მაგ. ფაილის წაშლისას)"""
+        with self._write_lock, self._cond:
+            self._pending = 0
+            self._first_change = None
+            self._failed = False
+
+    def flush(self, force=False):
+        """სინქრონული ჩაწერა. force=True წერს ფაილს მაშინაც, თუ ცვლილებები არ არის."""
+        return self._flush(force, background=False)
+
+    def _flush(self, force, background):
+        """ჩაწერა; ფონური ცდის (background=True) შეცდომა მხოლოდ ერთხელ გამოჩნდება"""
+        with self._batch_lock, self._write_lock:
+            with self._cond:
+                if not force and not self._pending:
+                    return True
+                pending = self._pending
+                self._pending = 0
+                self._first_change = None
+            try:
+                start = time.perf_counter()
+                written = self._write(self._snapshot())
+                metrics.record(self.name, time.perf_counter() - start)
+                metrics.add_bytes(self.name, written=written)
+                self._error_reported = False
+                return True
+            except Exception as e:
+                # ცვლილებები რჩება dirty, რომ შემდეგ ცდაზე ისევ ჩაიწეროს
+                with self._cond:
+                    self._pending += pending
+                    if self._first_change is None:
+                        self._first_change = time.monotonic()
+                    self._failed = True
+                if not (background and self._error_reported):
+                    print(f"ფაილში შენახვის შეცდომა ({self.file_path}): {e}")
+                    self._error_reported = True
+                return False
+
+    def close(self):
+        """ფონური ნაკადის გაჩერება და დარჩენილი ცვლილებების ჩაწერა"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        _open_stores.discard(self)
+        return self.flush()
+
+    def _write(self, data):
+        """ატომური ჩაწერა: დროებითი ფაილი + os.replace. აბრუნებს ჩაწერილ ბაიტებს."""
+        if self.compact:
+            text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        else:
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+        payload = text.encode("utf-8")
+
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        tmp_path = os.path.join(directory, f".{os.path.basename(self.file_path)}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+        # 0o666 - საბოლოო უფლებებს umask განსაზღვრავს, როგორც ჩვეულებრივი open()-ის დროს
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            # არსებული ფაილის უფლებების შენარჩუნება
+            if os.path.exists(self.file_path):
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.file_path).st_mode))
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return len(payload)
+
+    def _wait_for_batch(self):
+        """
+        აბრუნებს True-ს, როცა ჩაწერის დროა, False-ს, როცა store დაიხურა,
+        და None-ს, თუ _IDLE_TIMEOUT განმავლობაში store dirty არ ყოფილა.
+        """
+        with self._cond:
+            while not self._closed:
+                if not (self.autocommit and self._pending and not self._failed):
+                    # dirty store-ზე მიმართვა რჩება, რომ ცვლილებები არ დაიკარგოს
+                    if not self._cond.wait(_IDLE_TIMEOUT) and not self._pending:
+                        return None
+                    continue
+                if self._pending >= self.max_pending:
+                    return True
+                remaining = self._first_change + self.delay - time.monotonic()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(remaining)
+            return False
+
+
+def _writer_loop(store_ref):
+    """
+    ფონური ნაკადი: ელოდება ცვლილებების ჯგუფს და წერს ფაილს. store-ზე ინახავს მხოლოდ
+    weakref-ს, ამიტომ დაუხურავი და აღარ გამოყენებული store (და მისი ნაკადი) არ რჩება მეხსიერებაში.
+    """
+    while True:
+        store = store_ref()
+        if store is None:
+            return
+        ready = store._wait_for_batch()
+        if ready is False:
+            return
+        if ready:
+            store._flush(False, background=True)
+        del store
+
+
+@atexit.register
+def _close_open_stores():
+    """პროგრამიდან გასვლისას ყველა ღია store-ის დახურვა (დაუმახსოვრებელი ცვლილებების ჩაწერა)"""
+    for store in list(_open_stores):
+        store.close()